@@ -266,7 +266,6 @@ class Analyzer:
             # quick :)
             top = {id(data)}
         self._progress.reset(total=len(top))
-        start = datetime.now()
         count = 0
         for item in flatten(data):
             count += 1
@@ -74,6 +74,19 @@ class CharClass(frozenset):
         else:
             return super().__new__(cls, chars)
 
+    def _from_result(self, other, result):
+        # Set operations between two char classes can only ever produce a
+        # set of chars, so there's no need to re-validate the content of the
+        # result in the constructor
+        if result is NotImplemented:
+            return result
+        elif isinstance(other, CharClass):
+            if len(result) == sys.maxunicode + 1:
+                return AnyChar()
+            return frozenset.__new__(self.__class__, result)
+        else:
+            return self.__class__(result)
+
     def __repr__(self):
         return f'{self.__class__.__name__}({"".join(sorted(self))!r})'
 
@@ -112,32 +125,16 @@ class CharClass(frozenset):
                 return tag.pat(f'[{format_chars(self)}]')
 
     def __and__(self, other):
-        result = super().__and__(other)
-        if result is NotImplemented:
-            return result
-        else:
-            return self.__class__(result)
+        return self._from_result(other, super().__and__(other))
 
     def __or__(self, other):
-        result = super().__or__(other)
-        if result is NotImplemented:
-            return result
-        else:
-            return self.__class__(result)
+        return self._from_result(other, super().__or__(other))
 
     def __xor__(self, other):
-        result = super().__xor__(other)
-        if result is NotImplemented:
-            return result
-        else:
-            return self.__class__(result)
+        return self._from_result(other, super().__xor__(other))
 
     def __sub__(self, other):
-        result = super().__sub__(other)
-        if result is NotImplemented:
-            return result
-        else:
-            return self.__class__(result)
+        return self._from_result(other, super().__sub__(other))
 
     def union(self, *others):
         return self.__class__(super().union(*others))
@@ -170,13 +167,13 @@ class AnyChar:
         AnyChar()
     """
     _hash = None
+    _instance = None
 
     def __new__(cls):
         # Singleton instance
-        try:
-            return any_char
-        except NameError:
-            return super().__new__(cls)
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
 
     def __repr__(self):
         return 'AnyChar()'
@@ -21,6 +21,7 @@ class FrozenCounter(Mapping):
     def __init__(self, it):
         self._counter = Counter(it)
         self._hash = None
+        self._sorted = None
 
     @classmethod
     def from_counter(cls, counter):
@@ -34,15 +35,22 @@ class FrozenCounter(Mapping):
         returned verbatim).
         """
         if isinstance(counter, Counter):
-            self = cls(())
-            self._counter = counter.copy()
-            return self
+            return cls._wrap(counter.copy())
         elif isinstance(counter, FrozenCounter):
             # It's frozen; no need to go recreating stuff
             return counter
         else:
             assert False
 
+    @classmethod
+    def _wrap(cls, counter):
+        # Construct an instance around *counter* without copying it; only for
+        # use with counters that nothing else holds a reference to (e.g. the
+        # temporaries resulting from the arithmetic below)
+        self = cls(())
+        self._counter = counter
+        return self
+
     def most_common(self, n=None):
         """
         See :meth:`collections.Counter.most_common`.
@@ -55,6 +63,29 @@ class FrozenCounter(Mapping):
         """
         return self._counter.elements()
 
+    def sorted_keys(self):
+        """
+        Return a :class:`tuple` of the keys of the counter in sorted order.
+        As the counter is immutable, the result is calculated once and cached
+        for subsequent calls.
+        """
+        if self._sorted is None:
+            self._sorted = tuple(sorted(self._counter))
+        return self._sorted
+
+    # The views provided by the Mapping mixins are implemented in Python in
+    # terms of __iter__ and __getitem__; the underlying counter's views are
+    # read-only anyway so just return those (which iterate at C speed)
+
+    def keys(self):
+        return self._counter.keys()
+
+    def values(self):
+        return self._counter.values()
+
+    def items(self):
+        return self._counter.items()
+
     def __iter__(self):
         return iter(self._counter)
 
@@ -88,14 +119,32 @@ class FrozenCounter(Mapping):
 
     def __add__(self, other):
         if isinstance(other, FrozenCounter):
-            return FrozenCounter.from_counter(self._counter + other._counter)
+            result = FrozenCounter._wrap(self._counter + other._counter)
+            if self._sorted is not None and other._sorted is not None:
+                # Both key sequences are already sorted, so sorting their
+                # concatenation is a linear merge of two runs. Keys of each
+                # counter may be comparable amongst themselves but not with
+                # the other's (e.g. int and str); addition itself must not
+                # fail in that case, so just leave the cache empty
+                try:
+                    keys = tuple(sorted(self._sorted + tuple(
+                        key for key in other._sorted
+                        if key not in self._counter)))
+                except TypeError:
+                    pass
+                else:
+                    # Non-positive counts are excluded from the result; don't
+                    # bother with the cache in that (rare) case
+                    if len(keys) == len(result):
+                        result._sorted = keys
+            return result
         elif isinstance(other, Counter):
-            return FrozenCounter.from_counter(self._counter + other)
+            return FrozenCounter._wrap(self._counter + other)
         return NotImplemented
 
     def __sub__(self, other):
         if isinstance(other, FrozenCounter):
-            return FrozenCounter.from_counter(self._counter - other._counter)
+            return FrozenCounter._wrap(self._counter - other._counter)
         elif isinstance(other, Counter):
-            return FrozenCounter.from_counter(self._counter - other)
+            return FrozenCounter._wrap(self._counter - other)
         return NotImplemented
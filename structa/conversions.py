@@ -5,7 +5,8 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 
 import re
-from datetime import timedelta
+from datetime import datetime, timedelta
+from functools import lru_cache
 
 from dateutil.parser import parse
 from dateutil.relativedelta import relativedelta
@@ -32,26 +33,32 @@ def try_conversion(sample, conversion, threshold=0):
     """
     assert isinstance(sample, (Counter, FrozenCounter))
     assert sample
-    result = Counter()
+    # Converted values are accumulated in a plain dict (which is quicker to
+    # update than a Counter) and only wrapped in a Counter at the end
+    result = {}
+    get = result.get
     if threshold:
         assert threshold > 0
         for item, count in sample.items():
             try:
-                result[conversion(item)] += count
+                value = conversion(item)
             except ValueError: # XXX and TypeError?
                 threshold -= count
                 if threshold < 0:
                     raise
+            else:
+                result[value] = get(value, 0) + count
         if result:
-            return result
+            return Counter(result)
         else:
             # If threshold permitted us to get to this point but we managed to
             # convert absolutely nothing, that's not success!
             raise ValueError('zero successful conversions')
     else:
-        for item, count in sample.items():
-            result[conversion(item)] += count
-        return result
+        # Without a threshold, the conversions can all be run by map
+        for value, count in zip(map(conversion, sample), sample.values()):
+            result[value] = get(value, 0) + count
+        return Counter(result)
 
 
 def parse_bool(s, false='0', true='1'):
@@ -69,6 +76,93 @@ def parse_bool(s, false='0', true='1'):
         raise ValueError(f'not a valid bool {s!r}')
 
 
+_FAST_DATETIME_FIELDS = {
+    'Y': r'(\d{4})',
+    'm': r'(\d{2})',
+    'd': r'(\d{2})',
+    'H': r'(\d{2})',
+    'M': r'(\d{2})',
+    'S': r'(\d{2})',
+    'f': r'(\d{1,6})',
+}
+_FAST_DATETIME_ORDER = 'YmdHMSf'
+
+
+def _fast_datetime_regex(pattern):
+    """
+    Translate the :meth:`~datetime.datetime.strptime` *pattern* into a
+    compiled regular expression matching its fixed-width form, whose groups
+    can be passed (in order) to the :class:`~datetime.datetime` constructor.
+    Returns :data:`None` if *pattern* contains directives that cannot be
+    translated, or that don't appear in constructor order.
+    """
+    regex = []
+    fields = ''
+    # A dangling % at the end of the pattern is matched as a directive of its
+    # own (rather than skipped), and so is rejected below like any other
+    for literal, directive in re.findall(
+            r'([^%]*)(%.?|$)', pattern, re.DOTALL):
+        regex.append(re.escape(literal))
+        if directive == '%%':
+            regex.append('%')
+        elif directive:
+            try:
+                regex.append(_FAST_DATETIME_FIELDS[directive[1:]])
+            except KeyError:
+                return None
+            fields += directive[1]
+    if len(fields) < 3 or not _FAST_DATETIME_ORDER.startswith(fields):
+        return None
+    return re.compile(''.join(regex), re.ASCII)
+
+
+@lru_cache(maxsize=None)
+def get_datetime_parser(pattern):
+    """
+    Return a callable which, given a single string parameter, converts it to a
+    :class:`~datetime.datetime` according to *pattern*, in exactly the same
+    manner as :meth:`datetime.datetime.strptime`. For example:
+
+        >>> parser = get_datetime_parser('%Y-%m-%d %H:%M:%S')
+        >>> parser('2021-08-16 14:05:04')
+        datetime.datetime(2021, 8, 16, 14, 5, 4)
+
+    For patterns consisting only of numeric date and time directives (in
+    most-to-least significant order, like the common ISO-8601 style layouts),
+    the returned callable matches the fields out of the string with a
+    pre-compiled regular expression, only falling back to
+    :meth:`~datetime.datetime.strptime` for strings that don't match the
+    fixed-width layout (so that the lenient behaviour of the latter, e.g. with
+    non-zero-padded fields, is preserved). As with
+    :meth:`~datetime.datetime.strptime`, :exc:`ValueError` is raised if the
+    string does not match *pattern*.
+    """
+    strptime = datetime.strptime
+    regex = _fast_datetime_regex(pattern)
+    if regex is None:
+        def parser(s):
+            return strptime(s, pattern)
+    elif regex.groups == len(_FAST_DATETIME_ORDER):
+        # %f is present (necessarily as the last group, given the ordering
+        # enforced above, though not necessarily at the end of the pattern);
+        # like strptime, treat it as a fraction padded out to microseconds
+        match = regex.fullmatch
+        def parser(s):
+            m = match(s)
+            if m:
+                *fields, micro = m.groups()
+                return datetime(*map(int, fields), int(micro.ljust(6, '0')))
+            return strptime(s, pattern)
+    else:
+        match = regex.fullmatch
+        def parser(s):
+            m = match(s)
+            if m:
+                return datetime(*map(int, m.groups()))
+            return strptime(s, pattern)
+    return parser
+
+
 _SPANS = {
     span: re.compile(fr'(?:(?P<num>[+-]?\d+)\s*{suffix}\b)')
     for span, suffix in [
@@ -6,6 +6,7 @@
 
 from math import log
 from itertools import tee
+from functools import lru_cache
 from datetime import datetime, timedelta
 
 
@@ -78,6 +79,10 @@ def format_int(i):
         >>> format_int(2**32)
         '4.3G'
     """
+    if isinstance(i, int) and -1000 < i < 1000:
+        # Fast path for the (common) small integers which need no suffix; the
+        # int() call ensures bools come out as 0 and 1, not False and True
+        return str(int(i))
     suffixes = ('', 'K', 'M', 'G', 'T', 'P')
     try:
         index = min(len(suffixes) - 1, int(log(abs(i), 1000)))
@@ -99,20 +104,31 @@ def format_repr(self, **override):
         At present, this function does *not* handle recursive structures
         unlike :func:`reprlib.recursive_repr`.
     """
-    args = (
-        arg
-        for cls in self.__class__.mro() if cls is not object
-        for arg in cls.__slots__
-    )
     args_str = ', '.join(
         f'{arg}={override.get(arg, repr(getattr(self, arg)))}'
-        for arg in args
+        for arg in slot_names(self.__class__)
         if arg not in override
         or override[arg] is not None
     )
     return f'{self.__class__.__name__}({args_str})'
 
 
+@lru_cache(maxsize=None)
+def slot_names(cls):
+    """
+    Returns a :class:`tuple` of the names of all slots defined by *cls* and
+    its ancestors. The result is cached as slots can't change after class
+    creation.
+    """
+    result = []
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get('__slots__', ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        result.extend(slots)
+    return tuple(result)
+
+
 def format_sample(value):
     """
     Format a scalar value for output. The *value* can be a :class:`str`,
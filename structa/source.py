@@ -8,8 +8,8 @@ import io
 import re
 import csv
 import json
+import codecs
 import warnings
-from chardet.universaldetector import UniversalDetector
 
 from .errors import ValidationWarning
 
@@ -18,6 +18,32 @@ try:
 except ImportError:
     yaml = None
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# orjson silently converts integers beyond 64-bits to floats (where the json
+# module returns an int); any run of digits this long disqualifies a document
+# from the orjson fast path in Source._load_data
+_long_digits = re.compile(r'\d{19}')
+_long_digits_bytes = re.compile(rb'\d{19}')
+
+# Byte-order marks which identify an encoding outright, in the order they must
+# be tested (the UTF-32-LE mark begins with the UTF-16-LE mark). The names are
+# those chardet would report for the same input
+_boms = (
+    (codecs.BOM_UTF32_LE, 'UTF-32'),
+    (codecs.BOM_UTF32_BE, 'UTF-32'),
+    (codecs.BOM_UTF8, 'UTF-8-SIG'),
+    (codecs.BOM_UTF16_LE, 'UTF-16'),
+    (codecs.BOM_UTF16_BE, 'UTF-16'),
+)
+
+# Field delimiters considered by Source._detect_yaml_or_csv
+_field_delims = re.compile('[,; \t]')
+
 
 class Source:
     """
@@ -56,7 +82,8 @@ class Source:
         string delimiter (e.g. '"').
     :param bool yaml_safe:
         If :data:`True` (the default) the "safe" YAML parser from
-        `ruamel.yaml`_ will be used.
+        `ruamel.yaml`_ will be used (which is backed by its C extension, when
+        that is installed).
     :param bool json_strict:
         If :data:`True` (the default), control characters will not be permitted
         inside decoded strings.
@@ -80,6 +107,7 @@ class Source:
         self._json_strict = json_strict
         self._sample_limit = sample_limit
         self._sample = b''
+        self._sample_text = (None, None)
         self._data = None
 
     @property
@@ -132,11 +160,39 @@ class Source:
         return self._sample
 
     def _sample_str(self):
-        return self._sample_bytes().decode(self.encoding, errors='replace')
+        # The decoded sample is used by several detection methods so it is
+        # cached, keyed by the sample it was decoded from
+        sample = self._sample_bytes()
+        decoded_from, text = self._sample_text
+        if decoded_from is not sample:
+            text = sample.decode(self.encoding, errors='replace')
+            self._sample_text = (sample, text)
+        return text
 
     def _detect_encoding(self):
+        sample = self._sample_bytes()
+        for bom, encoding in _boms:
+            if sample.startswith(bom):
+                self._encoding = encoding
+                return
+        if sample.isascii() and b'\x00' not in sample:
+            # Pure ASCII is by far the most common case, and also valid UTF-8
+            # (which is the safer choice in case the data beyond the sample
+            # is not pure ASCII). NUL bytes are excluded as they're also
+            # "ASCII", but indicate BOM-less UTF-16 or UTF-32
+            self._encoding = 'utf-8'
+            return
+        # chardet is slow to import, and only needed when guessing encodings
+        from chardet.universaldetector import UniversalDetector
+
+        # Feed the detector in blocks so that it can stop early once it's
+        # certain, rather than examining the whole sample
         detector = UniversalDetector()
-        detector.feed(self._sample_bytes())
+        sample = memoryview(sample)
+        for offset in range(0, len(sample), 4096):
+            detector.feed(sample[offset:offset + 4096])
+            if detector.done:
+                break
         result = detector.close()
         if result['confidence'] < 0.9:
             warnings.warn(ValidationWarning(
@@ -145,7 +201,13 @@ class Source:
         self._encoding = result['encoding']
 
     def _detect_format(self):
-        sample = self._sample_str()
+        # Only the head of the sample is needed to distinguish the formats
+        # (unless it's all white-space); a truncated character at the end of
+        # the head is harmless as it's decoded with errors='replace'
+        sample = self._sample_bytes()[:4096].decode(
+            self.encoding, errors='replace')
+        if not sample.strip():
+            sample = self._sample_str()
         if sample[:5] == '<?xml':
             self._format = 'xml'
         else:
@@ -162,10 +224,10 @@ class Source:
                 self._detect_yaml_or_csv()
 
     def _detect_yaml_or_csv(self):
-        # Strip potentially partial last line off
-        sample = self._sample_str().splitlines(keepends=True)[:-1]
-        quote_delims = re.compile('["\']')
-        field_delims = re.compile('[,; \\t]')
+        # Only the first 64KB of the sample is scored, which is plenty of
+        # lines to judge by. Strip the potentially partial last line off
+        sample = self._sample_str()[:65536].splitlines(keepends=True)[:-1]
+        field_delims = _field_delims.search
         csv_score = yaml_score = 0
         for line in sample:
             if (
@@ -177,11 +239,10 @@ class Source:
                 # YAML
                 yaml_score += 2
                 continue
-            has_field_delims = bool(set(line) & set(',; \\t'))
-            quote_delims = max(
-                line.count(delim) for delim in ('"', "'"))
-            if has_field_delims and quote_delims and not (
-                quote_delims % 2):
+            has_field_delims = field_delims(line) is not None
+            quote_count = max(line.count('"'), line.count("'"))
+            if has_field_delims and quote_count and not (
+                quote_count % 2):
                 # Both field and quote delimiters found in the line and quote
                 # delimiters are paired. Also possible for YAML (hence
                 # continue) but the presence of paired quotes is a strong
@@ -223,29 +284,75 @@ class Source:
                 quoting = csv.QUOTE_MINIMAL
             self._csv_dialect = dialect
 
+    def _orjson_bytes(self, data):
+        if not orjson or not self._json_strict:
+            return False
+        if _long_digits_bytes.search(data):
+            return False
+        try:
+            encoding = codecs.lookup(self.encoding).name
+        except (TypeError, LookupError):
+            return False
+        return encoding == 'utf-8' or (encoding == 'ascii' and data.isascii())
+
     def _load_data(self):
         # The apparently pointless _sample_bytes call below isn't actually
         # pointless; it's required to set the _sample cache in case it's
         # queried by a later query of encoding, csv_dialect, etc.
-        data = self._sample_bytes() + self._source.read()
+        # The remainder of the source is read in chunks onto the end of a
+        # bytearray (which grows in place) rather than being concatenated
+        # with the sample; the latter briefly needs two copies of the data
+        data = bytearray(self._sample_bytes())
+        read = self._source.read
+        for chunk in iter(lambda: read(1048576), b''):
+            data += chunk
+        use_orjson = orjson and self._json_strict
+        if self.format == 'json' and self._orjson_bytes(data):
+            # orjson parses UTF-8 directly, so the decode can be skipped
+            # entirely; anything it rejects (including invalid UTF-8) goes
+            # through the usual decoding path below, but straight to the json
+            # module as orjson would only reject the decoded str again
+            try:
+                self._data = orjson.loads(data)
+            except orjson.JSONDecodeError:
+                use_orjson = False
+            else:
+                return
         data = data.decode(
             self.encoding,
             errors='strict' if self._encoding_strict else 'replace')
 
         if self.format == 'json':
-            self._data = json.loads(data, strict=self._json_strict)
+            # orjson is considerably faster than the json module, but it is
+            # always strict about control characters and also rejects things
+            # json accepts (NaN, Infinity, etc.), in which case we fall back
+            if use_orjson and not _long_digits.search(data):
+                try:
+                    self._data = orjson.loads(data)
+                except orjson.JSONDecodeError:
+                    self._data = json.loads(data, strict=True)
+            else:
+                self._data = json.loads(data, strict=self._json_strict)
         elif self.format == 'csv':
             # Exclude the first row of data from analysis in case it's a header
-            data = data.splitlines(keepends=True)[1:]
+            # (skipped on an iterator, rather than slicing a copy of the list).
+            # Note that splitlines() breaks rows on more than \r and \n (e.g.
+            # \x0c, \x1e, \u2028) which a TextIOWrapper would not
+            data = iter(data.splitlines(keepends=True))
+            next(data, None)
             reader = csv.reader(data, self.csv_dialect)
             self._data = list(reader)
         elif self.format == 'yaml':
             if not yaml:
                 raise ImportError('ruamel.yaml package is not installed')
+            elif self._yaml_safe:
+                # The "safe" YAML instance uses ruamel's C parser when it is
+                # available (falling back to pure Python otherwise), and
+                # resolves scalars as YAML 1.2, like the SafeLoader
+                self._data = yaml.YAML(typ='safe').load(data)
             else:
-                loader = (
-                    yaml.SafeLoader if self._yaml_safe else yaml.UnsafeLoader)
-                self._data = yaml.load(io.StringIO(data), Loader=loader)
+                self._data = yaml.load(
+                    io.StringIO(data), Loader=yaml.UnsafeLoader)
         elif self.format == 'xml':
             raise NotImplementedError()
         elif self.format == 'unknown':
@@ -4,29 +4,55 @@
 #
 # SPDX-License-Identifier: GPL-2.0-or-later
 
+import re
 import math
+import threading
 import datetime as dt
 from copy import copy
 from numbers import Real
 from textwrap import indent, shorten
-from functools import partial, total_ordering
+from functools import partial, total_ordering, lru_cache, wraps
+from itertools import chain, starmap
 from collections.abc import Mapping
-from operator import attrgetter
+from operator import attrgetter, add, eq
 
+from .chars import AnyChar
 from .collections import Counter, FrozenCounter
-from .conversions import try_conversion, parse_bool
+from .conversions import try_conversion, parse_bool, get_datetime_parser
 from .xml import ElementFactory, xml, merge_siblings
 from .format import (
     format_int,
     format_repr,
     format_sample,
     format_timestamp_numrepr,
+    slot_names,
 )
 
 
 tag = ElementFactory()
 
 
+def _indent(text):
+    # Equivalent to textwrap.indent(text, '    ') for the output of our
+    # __str__ methods, but performed by a single str.replace rather than
+    # line-by-line in Python; this matters as nested containers re-indent all
+    # their content at each level. The output of __str__ never contains lines
+    # of spaces, but may contain empty lines (e.g. from Empty) which indent
+    # leaves alone, so fall back to that when they're present
+    if not text or '\n\n' in text or text[0] == '\n' or text[-1] == '\n':
+        return indent(text, '    ')
+    return '    ' + text.replace('\n', '\n    ')
+
+
+def _shorten(text, width=60):
+    # textwrap.shorten is costly (it runs the full TextWrapper machinery) and
+    # the common case is text that's already short with no whitespace to
+    # collapse, which shorten would return unaltered
+    if len(text) <= width and text == ' '.join(text.split()):
+        return text
+    return shorten(text, width=width, placeholder='...')
+
+
 class Stats:
     """
     Stores cardinality, minimum, maximum, and (high) median of a *sample* of
@@ -90,9 +116,12 @@ class Stats:
         self.q2 = q2
         self.q3 = q3
         self.max = max
-        for value, count in self.sample.most_common():
-            self.unique = count == 1
-            break
+        # The sample is unique if its highest count is 1; as counts are
+        # positive that's equivalent to them summing to the number of keys,
+        # which avoids sorting the histogram (and the max builtin is shadowed
+        # here anyway)
+        if sample:
+            self.unique = sum(sample.values()) == len(sample)
 
     def __repr__(self):
         return format_repr(self, sample='...')
@@ -176,7 +205,11 @@ class Stats:
 
     def __add__(self, other):
         if isinstance(other, Stats):
-            return Stats.from_sample(self.sample + other.sample)
+            # The cardinality of the combined sample is known, and the sorted
+            # keys of the combined sample are derived from those of each
+            # side (see FrozenCounter.__add__) so neither needs recalculating
+            return Stats._from_sorted(
+                self.sample + other.sample, self.card + other.card)
         return NotImplemented
 
     @classmethod
@@ -187,11 +220,18 @@ class Stats:
         construct an instance after calculating the minimum, maximum, and
         quartile values of the *sample*.
         """
-        if not isinstance(sample, (Counter, FrozenCounter)):
+        if isinstance(sample, Counter):
+            sample = FrozenCounter.from_counter(sample)
+        elif not isinstance(sample, FrozenCounter):
             sample = FrozenCounter(sample)
         assert sample
-        keys = sorted(sample)
-        card = sum(sample.values())
+        return cls._from_sorted(sample, sum(sample.values()))
+
+    @classmethod
+    def _from_sorted(cls, sample, card):
+        # Calculate the quartiles of the FrozenCounter *sample* with the
+        # specified *card*, by walking its sorted keys
+        keys = sample.sorted_keys()
         indexes = (0, card // 4, card // 2, 3 * card // 4)
         summary = []
         index = 0
@@ -216,11 +256,18 @@ class Stats:
         lengths.
         """
         if isinstance(sample, (Counter, FrozenCounter)):
-            lengths = Counter()
+            # Accumulating in a plain dict is considerably quicker than
+            # incrementing a Counter (which is a dict subclass) per item
+            lengths = {}
+            get = lengths.get
             for item, count in sample.items():
-                lengths[len(item)] += count
+                length = len(item)
+                lengths[length] = get(length, 0) + count
+            # Construct the frozen counter directly; going via a Counter
+            # would mean from_sample copying it again
+            lengths = FrozenCounter(lengths)
         else:
-            lengths = FrozenCounter(len(item) for item in sample)
+            lengths = FrozenCounter(map(len, sample))
         return cls.from_sample(lengths)
 
     @property
@@ -261,6 +308,23 @@ class Type:
     def __xml__(self):
         return tag.type()
 
+    def __copy__(self):
+        # Merging relies heavily upon shallow copies of instances; this is
+        # considerably quicker than the generic __reduce_ex__ based route
+        # taken by copy.copy
+        cls = self.__class__
+        result = cls.__new__(cls)
+        for name in slot_names(cls):
+            try:
+                setattr(result, name, getattr(self, name))
+            except AttributeError:
+                # Unset slot
+                pass
+        state = getattr(self, '__dict__', None)
+        if state:
+            result.__dict__.update(state)
+        return result
+
     def __hash__(self):
         # Hashes have to be equal for items that compare equal but can be equal
         # or different for unequal items. We don't have anything else we can
@@ -295,6 +359,33 @@ class Type:
         return 0
 
 
+# While containers are being added, the equality of each pair of
+# sub-structures would otherwise be re-tested at every level of the tree (once
+# by the parent's __eq__, and again by the __add__ of each child). For the
+# duration of the outermost addition, this memo records the result of each
+# container comparison keyed by the identity of the operands (which are kept
+# alive by the memo, so their identities can't be re-used; the memo, and those
+# references, are dropped as soon as the outermost addition returns). The memo
+# is thread-local so that merges in separate threads can't interfere
+class _EqMemo(threading.local):
+    memo = None
+
+_eq_memo = _EqMemo()
+
+
+def _memoize_eq(method):
+    @wraps(method)
+    def wrapper(self, other):
+        if _eq_memo.memo is not None:
+            return method(self, other)
+        _eq_memo.memo = {}
+        try:
+            return method(self, other)
+        finally:
+            _eq_memo.memo = None
+    return wrapper
+
+
 class Container(Type):
     """
     Abstract base of all types that can contain other types. Constructed with a
@@ -347,9 +438,23 @@ class Container(Type):
         # The Stats lengths attribute is ignored as it has no bearing on the
         # actual structure itself
         if super().__eq__(other) is True:
-            return all(a == b for a, b in self._zip(other))
+            # Merged copies frequently share their content list; there's no
+            # need to walk it in that case
+            if self.content is other.content:
+                return True
+            memo = _eq_memo.memo
+            if memo is None:
+                return all(starmap(eq, self._zip(other)))
+            key = (id(self), id(other))
+            try:
+                return memo[key][0]
+            except KeyError:
+                result = all(starmap(eq, self._zip(other)))
+                memo[key] = (result, self, other)
+                return result
         return NotImplemented
 
+    @_memoize_eq
     def __add__(self, other):
         # The odd construct of calling self.__eq__(other) instead of testing
         # self == other is deliberate. It ensures that, in the case we're
@@ -361,7 +466,10 @@ class Container(Type):
             result = copy(self)
             result.sample = self.sample + other.sample
             result.lengths = self.lengths + other.lengths
-            result.content = [a + b for a, b in self._zip(other)]
+            # Equality has been established above, so every pair is known to
+            # be mergeable; starmap drives the additions without the overhead
+            # of a comprehension frame
+            result.content = list(starmap(add, self._zip(other)))
             return result
         return NotImplemented
 
@@ -418,13 +526,14 @@ class Dict(Container):
             result = ', '.join(fields)
             if '\n' in result or len(result) > 60:
                 result = ',\n'.join(fields)
-                return f'{{\n{indent(result, "    ")}\n}}'
+                return f'{{\n{_indent(result)}\n}}'
             else:
                 return f'{{{result}}}'
 
     def __xml__(self):
         return tag.dict(iter(super().__xml__()))
 
+    @_memoize_eq
     def __add__(self, other):
         # See notes in Container.__add__
         if self.__eq__(other) is True:
@@ -451,9 +560,9 @@ class Dict(Container):
                     key = sum(
                         [f.key for f in other.content],
                         self.content[0].key)
-                value = Redo(
-                    sum((list(f.value.sample) for f in self.content), []) +
-                    sum((list(f.value.sample) for f in other.content), []))
+                value = Redo(list(chain.from_iterable(
+                    f.value.sample for f in chain(self.content, other.content)
+                )))
                 result.content = [DictField(key, value)]
             else:
                 result = super().__add__(other)
@@ -462,6 +571,14 @@ class Dict(Container):
         return NotImplemented
 
     def _zip(self, other):
+        # When both sides hold the very same keys in the same order (as is
+        # the case when merging with a copy), the alignment performed by
+        # zip_dict_fields is redundant
+        if (
+            len(self.content) == len(other.content) and
+            all(a.key is b.key for a, b in zip(self.content, other.content))
+        ):
+            return zip(self.content, other.content)
         # XXX What about other.similarity_threshold? It's not variable
         # currently but worth considering for future
         return zip_dict_fields(self.content, other.content,
@@ -518,11 +635,13 @@ class DictField(Type):
 
     def __eq__(self, other):
         if isinstance(other, DictField):
+            if self.value is None or other.value is None:
+                return False
+            elif self is other:
+                return True
             return (
                 super().__eq__(other) is True and
                 self.key == other.key and
-                self.value is not None and
-                other.value is not None and
                 self.value == other.value)
         return NotImplemented
 
@@ -552,7 +671,7 @@ class Tuple(Container):
             result = ', '.join(fields)
             if '\n' in result or len(result) > 60:
                 result = ',\n'.join(fields)
-                return f'(\n{indent(result, "    ")}\n)'
+                return f'(\n{_indent(result)}\n)'
             else:
                 return f'({result})'
 
@@ -618,11 +737,13 @@ class TupleField(Type):
 
     def __eq__(self, other):
         if isinstance(other, TupleField):
+            if self.value is None or other.value is None:
+                return False
+            elif self is other:
+                return True
             return (
                 super().__eq__(other) is True and
                 self.index == other.index and
-                self.value is not None and
-                other.value is not None and
                 self.value == other.value)
         return NotImplemented
 
@@ -646,7 +767,7 @@ class List(Container):
             result = ', '.join(elems)
             if '\n' in result or len(result) > 60:
                 result = ',\n'.join(elems)
-                return f'[\n{indent(result, "    ")}\n]'
+                return f'[\n{_indent(result)}\n]'
             else:
                 return f'[{result}]'
 
@@ -657,7 +778,8 @@ class List(Container):
         # The Stats lengths attribute is ignored as it has no bearing on the
         # actual structure itself
         if super().__eq__(other) is True:
-            return all(a == b for a, b in zip(self.content, other.content))
+            # Container.__eq__ has already compared the content pairwise
+            return True
         return NotImplemented
 
     def validate(self, value):
@@ -704,7 +826,11 @@ class Scalar(Type):
     def __add__(self, other):
         # See notes in Container.__add__
         if self.__eq__(other) is True:
-            if issubclass(self.__class__, other.__class__):
+            self_cls = self.__class__
+            other_cls = other.__class__
+            # Merging scalars of the same class (Int + Int, etc.) is by far
+            # the common case, and has no need for the sub-class test
+            if self_cls is not other_cls and issubclass(self_cls, other_cls):
                 result = copy(other)
             else:
                 result = copy(self)
@@ -764,10 +890,11 @@ class Float(Scalar):
         """
         if not isinstance(value, float):
             raise TypeError(f'{value!r} is not a float')
-        if not self.values.min <= value <= self.values.max:
+        values = self.values
+        if not values.min <= value <= values.max:
             raise ValueError(
-                f'{value!r} is not between {self.values.min!r} and '
-                f'{self.values.max!r}')
+                f'{value!r} is not between {values.min!r} and '
+                f'{values.max!r}')
 
 
 class Int(Float):
@@ -795,9 +922,11 @@ class Int(Float):
             'd': 10,
             'x': 16,
         }[pattern]
+        # Plain int (rather than a partial) is notably quicker for the common
+        # decimal case
+        conv = int if base == 10 else partial(int, base=base)
         return StrRepr(
-            cls(try_conversion(
-                sample, partial(int, base=base), bad_threshold)),
+            cls(try_conversion(sample, conv, bad_threshold)),
             pattern=pattern)
 
     def __str__(self):
@@ -818,10 +947,11 @@ class Int(Float):
         """
         if not isinstance(value, int):
             raise TypeError(f'{value!r} is not an int')
-        if not self.values.min <= value <= self.values.max:
+        values = self.values
+        if not values.min <= value <= values.max:
             raise ValueError(
-                f'{value!r} is not between {self.values.min!r} and '
-                f'{self.values.max!r}')
+                f'{value!r} is not between {values.min!r} and '
+                f'{values.max!r}')
 
 
 class Bool(Int):
@@ -870,9 +1000,12 @@ class Bool(Int):
         :raises TypeError: if *value* is not a :class:`bool` or :class:`int`
         :raises ValueError: if *value* is an :class:`int` that is not 0 or 1
         """
-        if isinstance(value, bool):
+        # Check the concrete types first; the isinstance test is only needed
+        # for int descendents other than bool (e.g. IntEnum)
+        value_type = type(value)
+        if value_type is bool:
             pass
-        elif isinstance(value, int):
+        elif value_type is int or isinstance(value, int):
             if not value in (0, 1):
                 raise ValueError(f'{value!r} is not 0 or 1')
         else:
@@ -900,7 +1033,7 @@ class DateTime(Scalar):
         compatible with :meth:`datetime.datetime.strptime`), and a
         *bad_threshold* of values which are permitted to fail conversion.
         """
-        conv = lambda s: dt.datetime.strptime(s, pattern)
+        conv = get_datetime_parser(pattern)
         return StrRepr(
             cls(try_conversion(iterable, conv, bad_threshold)),
             pattern=pattern)
@@ -926,11 +1059,12 @@ class DateTime(Scalar):
             num_pattern = pattern.content
         else:
             num_pattern = pattern
-        dt_counter = Counter()
-        for value, count in num_pattern.values.sample.items():
-            dt_value = dt.datetime.fromtimestamp(
-                (value * scale) + offset, tz=dt.timezone.utc)
-            dt_counter[dt_value] = count
+        fromtimestamp = dt.datetime.fromtimestamp
+        utc = dt.timezone.utc
+        dt_counter = Counter({
+            fromtimestamp((value * scale) + offset, tz=utc): count
+            for value, count in num_pattern.values.sample.items()
+        })
         result = NumRepr(cls(dt_counter), pattern=(
             num_pattern.__class__, scale, offset))
         if isinstance(pattern, StrRepr):
@@ -956,11 +1090,12 @@ class DateTime(Scalar):
         """
         if not isinstance(value, dt.datetime):
             raise TypeError(f'{value!r} is not a datetime')
-        if not self.values.min <= value <= self.values.max:
+        values = self.values
+        if not values.min <= value <= values.max:
             raise ValueError(
                 f'{value:%Y-%m-%d %H:%M:%S} is not between '
-                f'{self.values.min:%Y-%m-%d %H:%M:%S} and '
-                f'{self.values.max:%Y-%m-%d %H:%M:%S}')
+                f'{values.min:%Y-%m-%d %H:%M:%S} and '
+                f'{values.max:%Y-%m-%d %H:%M:%S}')
 
 
 class Str(Scalar):
@@ -982,29 +1117,52 @@ class Str(Scalar):
         pattern to its values. Otherwise a sequence of
         :class:`~structa.chars.CharClass` instances indicating the valid
         characters at each position of the string.
+
+    .. attribute:: pattern_str
+        :type: str
+
+        :data:`None` if :attr:`pattern` is :data:`None`. Otherwise, the
+        :attr:`pattern` rendered as a string.
     """
-    __slots__ = ('lengths', 'pattern')
+    __slots__ = ('lengths', 'pattern', '_pattern_str', '_pattern_regex')
 
     def __init__(self, sample, pattern=None):
         super().__init__(sample)
         self.lengths = Stats.from_lengths(sample)
         self.pattern = pattern
+        self._pattern_str = (None, None)
+        self._pattern_regex = (None, None)
 
     def __repr__(self):
-        return format_repr(self, lengths=None, values='...')
+        return format_repr(self, lengths=None, values='...',
+                           _pattern_str=None, _pattern_regex=None)
 
     def __str__(self):
         if self.pattern is None:
             return 'str'
         else:
-            pattern = ''.join(str(c) for c in self.pattern)
-            return f'str pattern={shorten(pattern, width=60, placeholder="...")}'
+            return f'str pattern={_shorten(self.pattern_str)}'
+
+    @property
+    def pattern_str(self):
+        # The rendering is cached along with the pattern it was rendered from;
+        # instances are copied and have their pattern replaced when merged, so
+        # the cache is only valid while the pattern is the very same object
+        pattern = self.pattern
+        cached_pattern, result = self._pattern_str
+        if cached_pattern is not pattern:
+            if pattern is None:
+                result = None
+            else:
+                result = ''.join(str(c) for c in pattern)
+            self._pattern_str = (pattern, result)
+        return result
 
     def __xml__(self):
         return tag.str(
             iter(super().__xml__()),
             tag.lengths(iter(xml(self.lengths))),
-            merge_siblings(tag.pattern(xml(c) for c in self.pattern))
+            merge_siblings(tag.pattern(map(xml, self.pattern)))
                 if self.pattern else []
         )
 
@@ -1017,8 +1175,16 @@ class Str(Scalar):
             ):
                 # XXX We can do better here
                 new_pattern = None
+            elif self.pattern == other.pattern:
+                # List comparison tests identity before equality so this is
+                # cheap for the common case of merging similar strings; the
+                # pattern is never mutated so it can simply be shared
+                new_pattern = self.pattern
             else:
+                # Where a position holds the very same char class in both
+                # patterns re-use it rather than constructing a new one
                 new_pattern = [
+                    self_char if self_char is other_char else
                     self_char | other_char
                     for self_char, other_char
                     in zip(self.pattern, other.pattern)
@@ -1046,13 +1212,25 @@ class Str(Scalar):
             raise ValueError(
                 f'{value!r} is not between {self.values.min!r} and '
                 f'{self.values.max!r}')
-        if self.pattern is not None:
-            for c1, c2 in zip(value, self.pattern):
-                if c1 not in c2:
-                    pattern = ''.join(str(c) for c in self.pattern)
-                    raise ValueError(
-                        f'{value!r} does not match '
-                        f'{shorten(pattern, width=60, placeholder="...")}')
+        pattern = self.pattern
+        if pattern is not None:
+            # Note that the pattern is only matched against as much of the
+            # value as it covers (and vice versa). Patterns are only found
+            # for fixed length strings, so values are typically at least as
+            # long as the pattern; the regex for that case is cached (as with
+            # pattern_str, only while the pattern is the very same object) to
+            # avoid hashing the whole pattern to look it up each time
+            if len(value) >= len(pattern):
+                cached_pattern, regex = self._pattern_regex
+                if cached_pattern is not pattern:
+                    regex = pattern_regex(tuple(pattern))
+                    self._pattern_regex = (pattern, regex)
+            else:
+                regex = pattern_regex(tuple(pattern[:len(value)]))
+            if not regex.match(value):
+                raise ValueError(
+                    f'{value!r} does not match '
+                    f'{_shorten(self.pattern_str)}')
 
 
 class Repr(Type):
@@ -1131,16 +1309,15 @@ class StrRepr(Repr):
 
     def __add__(self, other):
         if self == other:
-            if isinstance(self.content, other.content.__class__):
+            self_cls = self.content.__class__
+            other_cls = other.content.__class__
+            if issubclass(self_cls, other_cls):
                 child, parent = self, other
             else:
                 child, parent = other, self
-            if (
-                child.content.__class__ is Int and
-                parent.content.__class__ is Int
-            ):
-                pattern = sorted(child.pattern + parent.pattern,
-                                 key=self.int_bases.get)[-1]
+            if self_cls is Int and other_cls is Int:
+                pattern = max(child.pattern, parent.pattern,
+                              key=self.int_bases.get)
             else:
                 pattern = parent.pattern
             return parent.__class__(child.content + parent.content, pattern)
@@ -1155,43 +1332,27 @@ class StrRepr(Repr):
             return NotImplemented
         if super().__eq__(other) is not True:
             return False
-        if isinstance(self.content, other.content.__class__):
-            child, parent = self, other
+        self_cls = self.content.__class__
+        other_cls = other.content.__class__
+        if issubclass(self_cls, other_cls):
+            rule = self._eq_rules[self_cls, other_cls]
+            return rule(self.pattern, other.pattern)
         else:
-            child, parent = other, self
-        return {
-            (Bool,     Bool):     lambda: child.pattern == parent.pattern,
-            (Bool,     Int):      lambda: child.pattern == '0|1',
-            (Bool,     Float):    lambda: child.pattern == '0|1',
-            (Int,      Int):      lambda: True,
-            (Int,      Float):    lambda: child.pattern != 'x',
-            (Float,    Float):    lambda: True,
-            (DateTime, DateTime): lambda: child.pattern == parent.pattern,
-            (NumRepr,  NumRepr):  lambda: True,
-        }[child.content.__class__, parent.content.__class__]()
+            rule = self._eq_rules[other_cls, self_cls]
+            return rule(other.pattern, self.pattern)
 
     def validate(self, value):
         if not isinstance(value, str):
             raise TypeError(f'{value!r} is not a str')
-        if isinstance(self.content, Bool):
-            false, true = self.pattern.split('|', 1)
-            value = parse_bool(value, false, true)
-        elif isinstance(self.content, Int) or (
-            isinstance(self.content, NumRepr) and
-            self.content.pattern[0] is Int
-        ):
-            value = int(value, base=self.int_bases[self.pattern])
-        elif isinstance(self.content, Float) or (
-            isinstance(self.content, NumRepr) and
-            self.content.pattern[0] is Float
-        ):
-            assert self.pattern == 'f'
-            value = float(value)
-        elif isinstance(self.content, DateTime):
-            value = dt.datetime.strptime(value, self.pattern)
-        else:
-            assert False, f'validating str-repr of {self.content!r}'
-        self.content.validate(value)
+        content = self.content
+        content_cls = content.__class__
+        if content_cls is NumRepr:
+            content_cls = content.pattern[0]
+        try:
+            parser = self._parsers[content_cls]
+        except KeyError:
+            assert False, f'validating str-repr of {content!r}'
+        content.validate(parser(self.pattern, value))
 
 
 class NumRepr(Repr):
@@ -1243,7 +1404,13 @@ class NumRepr(Repr):
         return (self_scale == other_scale) and (self_offset == other_offset)
 
     def validate(self, value):
-        if not isinstance(value, Real):
+        # Check the common concrete types before falling back to the
+        # (comparatively slow) ABC check
+        value_type = type(value)
+        if (
+            value_type is not int and value_type is not float and
+            not isinstance(value, Real)
+        ):
             raise TypeError(f'{value!r} is not a number')
         if isinstance(self.content, DateTime):
             type_, scale, offset = self.pattern
@@ -1254,6 +1421,39 @@ class NumRepr(Repr):
         self.content.validate(value)
 
 
+# The table of compatibility rules used by StrRepr.__eq__, keyed by the
+# classes of the "child" and "parent" content, and called with the patterns
+# of the child and parent. This can't be defined in the class body as it
+# refers to NumRepr (and it's built once here rather than on each comparison)
+StrRepr._eq_rules = {
+    (Bool,     Bool):     eq,
+    (Bool,     Int):      lambda child, parent: child == '0|1',
+    (Bool,     Float):    lambda child, parent: child == '0|1',
+    (Int,      Int):      lambda child, parent: True,
+    (Int,      Float):    lambda child, parent: child != 'x',
+    (Float,    Float):    lambda child, parent: True,
+    (DateTime, DateTime): eq,
+    (NumRepr,  NumRepr):  lambda child, parent: True,
+}
+
+
+def _parse_float_repr(pattern, value):
+    assert pattern == 'f'
+    return float(value)
+
+
+# The table of parsers used by StrRepr.validate to convert a string to the
+# type of the content, keyed by the class of the content (or, for a NumRepr,
+# the class of the numbers it represents). Like the rules above, this avoids
+# a chain of isinstance checks on each call
+StrRepr._parsers = {
+    Bool:     lambda pattern, value: parse_bool(value, *pattern.split('|', 1)),
+    Int:      lambda pattern, value: int(value, base=StrRepr.int_bases[pattern]),
+    Float:    _parse_float_repr,
+    DateTime: lambda pattern, value: get_datetime_parser(pattern)(value),
+}
+
+
 class URL(Str):
     """
     A specialization of :class:`Str` for representing URLs. Currently does
@@ -1267,8 +1467,7 @@ class URL(Str):
     def __xml__(self):
         return tag.url(
             iter(super().__xml__()),
-            pattern=None if self.pattern is None else
-                    ''.join(str(c) for c in self.pattern)
+            pattern=self.pattern_str
         )
 
     def validate(self, value):
@@ -1288,11 +1487,15 @@ class Fields(Type):
     Internally used to represent all possible fields of a mapping during the
     first phase of analysis. Should never appear in analysis reuslts, however.
     """
-    __slots__ = ('values',)
+    __slots__ = ('values', '_accepted')
 
     def __init__(self, values):
         self.values = frozenset(values)
         assert all(isinstance(value, Field) for value in self.values)
+        self._accepted = frozenset(choice.value for choice in self.values)
+
+    def __repr__(self):
+        return format_repr(self, _accepted=None)
 
     def __len__(self):
         return len(self.values)
@@ -1301,20 +1504,20 @@ class Fields(Type):
         return iter(self.values)
 
     def __str__(self):
-        choices = shorten(
-            '|'.join(str(choice) for choice in self),
-            width=60, placeholder='...')
+        choices = _shorten('|'.join(str(choice) for choice in self))
         return f'<{choices}>'
 
     def validate(self, value):
-        for choice in self:
-            try:
-                choice.validate(value)
-            except (TypeError, ValueError) as exc:
-                last_exc = exc
-            else:
+        # Field.validate is a simple equality test, so validating against all
+        # choices is a membership test of the choices' values (field values
+        # are necessarily hashable)
+        try:
+            if value in self._accepted:
                 return
-        raise last_exc
+        except TypeError:
+            # Unhashable values can't match any choice
+            pass
+        raise ValueError(f'{value!r} does not match any of {self}')
 
 
 class Field(Type):
@@ -1518,12 +1721,13 @@ class Empty(Type):
     """
     __slots__ = ()
 
+    _instance = None
+
     def __new__(cls):
         # This is a singleton class; all instances are the same
-        try:
-            return _empty
-        except NameError:
-            return super().__new__(cls)
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
 
     __hash__ = Type.__hash__
 
@@ -1575,6 +1779,8 @@ class Empty(Type):
 
 
 _empty = Empty()
+_empty_tuple_field = TupleField(_empty, _empty)
+_empty_dict_field = DictField(_empty, _empty)
 
 
 def zip_tuple_fields(it1, it2):
@@ -1584,41 +1790,101 @@ def zip_tuple_fields(it1, it2):
     for index in common_indexes:
         yield indexes1[index], indexes2[index]
     for index in indexes1.keys() - indexes2.keys():
-        yield indexes1[index], TupleField(_empty, _empty)
+        yield indexes1[index], _empty_tuple_field
     for index in indexes2.keys() - indexes1.keys():
-        yield TupleField(_empty, _empty), indexes2[index]
+        yield _empty_tuple_field, indexes2[index]
+
+
+def _all_fields(items):
+    # Equivalent to all(type(item.key) is Field for item in items) without the
+    # generator; mappings are usually homogeneous so a mixed one typically
+    # bails on the first key
+    for item in items:
+        if type(item.key) is not Field:
+            return False
+    return True
 
 
 def zip_dict_fields(it1, it2, *, similarity_threshold=1):
-    fields1 = {item.key: item for item in it1}
-    fields2 = {item.key: item for item in it2}
-    all_fields1 = all(isinstance(key, Field) for key in fields1)
-    all_fields2 = all(isinstance(key, Field) for key in fields2)
+    # This returns a list rather than yielding pairs; the result is always
+    # consumed immediately, and the field counts are typically small enough
+    # that the generator's overhead outweighs the cost of the list
+    all_fields1 = _all_fields(it1)
+    all_fields2 = _all_fields(it2)
     if all_fields1 and all_fields2:
-        common_keys = fields1.keys() & fields2.keys()
+        # Amongst themselves, Field keys are equal exactly when their values
+        # are, so the mappings are keyed on the values. Field itself can't
+        # hash by value (it compares equal to Value, Empty, etc.), so keying
+        # on the Field instances would put every key in the same bucket
+        fields1 = {item.key.value: item for item in it1}
+        fields2 = {item.key.value: item for item in it2}
+        keys1 = fields1.keys()
+        keys2 = fields2.keys()
+        common_keys = keys1 & keys2
         minimum_common = similarity_threshold * min(len(fields1), len(fields2))
         if len(common_keys) >= math.ceil(minimum_common):
-            for key in common_keys:
-                yield fields1[key], fields2[key]
-            for key in fields1.keys() - fields2.keys():
-                yield fields1[key], DictField(_empty, _empty)
-            for key in fields2.keys() - fields1.keys():
-                yield DictField(_empty, _empty), fields2[key]
+            result = [(fields1[key], fields2[key]) for key in common_keys]
+            result.extend(
+                (fields1[key], _empty_dict_field)
+                for key in keys1 - common_keys)
+            result.extend(
+                (_empty_dict_field, fields2[key])
+                for key in keys2 - common_keys)
+            return result
         else:
-            for field1 in fields1.values():
-                yield field1, None
-            for field2 in fields2.values():
-                yield None, field2
+            result = [(field1, None) for field1 in fields1.values()]
+            result.extend((None, field2) for field2 in fields2.values())
+            return result
     elif all_fields1 and not all_fields2:
-        assert len(fields2) == 1
-        for key_type in fields2:
-            for key in fields1:
-                yield fields1[key], fields2[key_type]
+        assert len(it2) == 1
+        [field2] = it2
+        return [(field1, field2) for field1 in it1]
     elif not all_fields1 and all_fields2:
-        assert len(fields1) == 1
-        for key_type in fields1:
-            for key in fields2:
-                yield fields1[key_type], fields2[key]
+        assert len(it1) == 1
+        [field1] = it1
+        return [(field1, field2) for field2 in it2]
     else: # if not all_fields1 and not all_fields2:
-        assert len(fields1) == len(fields2) == 1
-        yield it1[0], it2[0]
+        assert len(it1) == len(it2) == 1
+        return [(it1[0], it2[0])]
+
+
+@lru_cache(maxsize=1024)
+def pattern_regex(pattern):
+    """
+    Given a tuple of :class:`~structa.chars.CharClass` (or
+    :class:`~structa.chars.AnyChar`) instances in *pattern*, return a compiled
+    regular expression that matches strings with a character from each class
+    at each successive position. For example::
+
+        >>> pattern_regex((CharClass('abd'), dec_digit, AnyChar()))
+        re.compile('[abd][0-9].', re.DOTALL)
+
+    The result is cached as the same patterns are typically validated against
+    many times. Runs of consecutive characters within a class are collapsed
+    into ranges to keep the compiled character sets small.
+    """
+    def char_regex(chars):
+        if isinstance(chars, AnyChar):
+            return '.'
+        elif len(chars) == 0:
+            return '(?!)'
+        elif len(chars) == 1:
+            return re.escape(*chars)
+        else:
+            ranges = []
+            codes = sorted(map(ord, chars))
+            start = stop = codes[0]
+            for code in codes[1:] + [None]:
+                if code == stop + 1:
+                    stop = code
+                else:
+                    if stop - start > 1:
+                        ranges.append(
+                            f'{re.escape(chr(start))}-{re.escape(chr(stop))}')
+                    else:
+                        ranges.extend(
+                            re.escape(chr(c)) for c in range(start, stop + 1))
+                    start = stop = code
+            return f'[{"".join(ranges)}]'
+
+    return re.compile(''.join(char_regex(c) for c in pattern), re.DOTALL)
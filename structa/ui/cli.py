@@ -12,10 +12,6 @@ import warnings
 from fractions import Fraction
 from datetime import datetime, timedelta
 
-from blessings import Terminal
-from tqdm import tqdm
-from pkg_resources import require
-
 from ..analyzer import Analyzer
 from ..errors import ValidationWarning
 from ..types import sources_list, SourcesList
@@ -65,10 +61,25 @@ RANGE_CONFIGS = {
 }
 
 
+class VersionAction(argparse.Action):
+    # Equivalent to argparse's "version" action, but only queries the version
+    # (importing the costly pkg_resources) when the option is actually given
+    def __init__(self, option_strings, dest=argparse.SUPPRESS,
+                 default=argparse.SUPPRESS,
+                 help="show program's version number and exit"):
+        super().__init__(option_strings=option_strings, dest=dest,
+                         default=default, nargs=0, help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        from pkg_resources import require
+
+        print(require('structa')[0].version)
+        parser.exit()
+
+
 def get_config(args):
     parser = argparse.ArgumentParser()
-    parser.add_argument(
-        '--version', action='version', version=require('structa')[0].version)
+    parser.add_argument('--version', action=VersionAction)
     parser.add_argument(
         'file', nargs='*', type=file, default=[sys.stdin.buffer],
         help="The data-file(s) to analyze; if this is - or unspecified then "
@@ -235,6 +246,10 @@ def get_config(args):
 
 
 def get_structure(config):
+    # tqdm (and blessings below) are imported on demand as they're relatively
+    # expensive, and unnecessary for --help, --version, or bad options
+    from tqdm import tqdm
+
     bar_format='{desc} {percentage:4.1f}%  {elapsed} [{bar}] {remaining}'
     with tqdm(config.file, leave=False, bar_format=bar_format, maxinterval=1) as progress:
         data = sources_list()
@@ -267,6 +282,8 @@ def get_structure(config):
 
 
 def print_structure(config, structure):
+    from blessings import Terminal
+
     term = Terminal()
     styles = {
         'normal-style':    term.normal,
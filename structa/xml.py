@@ -5,7 +5,6 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 
 from copy import copy
-from pkg_resources import resource_stream
 
 import lxml.etree as et
 
@@ -27,6 +26,8 @@ def get_transform(name):
     Return the XSLT transform defined by *name* in the :mod:`structa.ui`
     module.
     """
+    from pkg_resources import resource_stream
+
     return et.XSLT(et.parse(resource_stream(ui.__name__, name)))
 
 
@@ -27,6 +27,14 @@ def test_help(capsys):
     assert captured.out.lstrip().startswith('usage: ')
 
 
+def test_version(capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        cli.main(['--version'])
+    assert exc_info.value.args[0] == 0  # return code 0
+    captured = capsys.readouterr()
+    assert captured.out.strip()
+
+
 def test_min_timestamp():
     assert cli.min_timestamp('2000-01-01') == dt.datetime(2000, 1, 1)
     assert cli.min_timestamp('10 years') == cli._start - relativedelta(years=10)
@@ -20,6 +20,8 @@ def test_frozencounter_construction():
     assert len(b) == 3
     assert sorted(b) == [1, 2, 3]
     assert tuple(b.values()) == (1,) * 3
+    assert set(a.items()) == {(1, 3)}
+    assert b.items() == {(1, 1), (2, 1), (3, 1)}
 
 
 def test_frozencounter_hashable():
@@ -77,3 +79,17 @@ def test_frozencounter_from_counter():
         FrozenCounter.from_counter({})
     assert FrozenCounter.from_counter(c)._counter is not c
     assert FrozenCounter.from_counter(f) is f
+
+
+def test_frozencounter_sorted_keys():
+    a = FrozenCounter((3, 1, 2, 1))
+    b = FrozenCounter((4, 0, 2))
+    assert a.sorted_keys() == (1, 2, 3)
+    assert a.sorted_keys() is a.sorted_keys()
+    assert b.sorted_keys() == (0, 2, 4)
+    assert (a + b).sorted_keys() == (0, 1, 2, 3, 4)
+    assert (a + FrozenCounter(())).sorted_keys() == (1, 2, 3)
+    assert FrozenCounter(()).sorted_keys() == ()
+    c = FrozenCounter(('a', 'b'))
+    assert c.sorted_keys() == ('a', 'b')
+    assert a + c == FrozenCounter((3, 1, 2, 1, 'a', 'b'))
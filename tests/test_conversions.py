@@ -37,6 +37,48 @@ def test_parse_bool():
         parse_bool('f')
 
 
+def test_get_datetime_parser():
+    for fmt in (
+        '%Y-%m-%d', '%Y-%m-%dT%H:%M', '%Y-%m-%d %H:%M',
+        '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%a, %d %b %Y %H:%M:%S',
+    ):
+        parser = get_datetime_parser(fmt)
+        assert parser is get_datetime_parser(fmt)
+        when = dt.datetime(2021, 8, 16, 14, 5, 4)
+        s = when.strftime(fmt)
+        assert parser(s) == dt.datetime.strptime(s, fmt)
+        with pytest.raises(ValueError):
+            parser('foo')
+    parser = get_datetime_parser('%Y-%m-%d')
+    assert parser('2021-8-6') == dt.datetime(2021, 8, 6)
+    with pytest.raises(ValueError):
+        parser('2021-13-01')
+    with pytest.raises(ValueError):
+        parser('2021-01-01 ')
+    # Non-ASCII digits fall through to strptime which accepts them
+    assert parser('２０２１-01-01') == dt.datetime(2021, 1, 1)
+    parser = get_datetime_parser('%Y-%m-%d %H:%M:%S.%f')
+    assert parser('2021-08-16 14:05:04.12') == dt.datetime(
+        2021, 8, 16, 14, 5, 4, 120000)
+    assert parser('2021-08-16 14:05:04.000001') == dt.datetime(
+        2021, 8, 16, 14, 5, 4, 1)
+    with pytest.raises(ValueError):
+        parser('2021-08-16 14:05:04.1234567')
+    parser = get_datetime_parser('%Y-%m-%dT%H:%M:%S.%fZ')
+    assert parser('2021-08-16T14:05:04.12Z') == dt.datetime(
+        2021, 8, 16, 14, 5, 4, 120000)
+    assert parser('2021-08-16T14:05:04.12Z') == dt.datetime.strptime(
+        '2021-08-16T14:05:04.12Z', '%Y-%m-%dT%H:%M:%S.%fZ')
+    parser = get_datetime_parser('%d/%m/%Y')
+    assert parser('16/08/2021') == dt.datetime(2021, 8, 16)
+    # A dangling % is an error for strptime, so it must be for the parser too
+    parser = get_datetime_parser('%Y-%m-%d %H:%M:%S%')
+    with pytest.raises(ValueError):
+        dt.datetime.strptime('2021-08-16 14:05:04', '%Y-%m-%d %H:%M:%S%')
+    with pytest.raises(ValueError):
+        parser('2021-08-16 14:05:04')
+
+
 def test_parse_duration():
     assert parse_duration('') == relativedelta(seconds=0)
     assert parse_duration('1 week') == relativedelta(days=7)
@@ -31,6 +31,10 @@ def test_format_int():
     assert format_int(-1000) == '-1.0K'
     assert format_int(999900) == '999.9K'
     assert format_int(1000000) == '1.0M'
+    assert format_int(0.0) == '0'
+    assert format_int(0.5) == '0.5'
+    assert format_int(False) == '0'
+    assert format_int(True) == '1'
 
 
 def test_format_repr():
@@ -44,6 +48,17 @@ def test_format_repr():
 
     assert repr(A(1)) == 'A(foo=1, bar=2)'
 
+    class B(A):
+        pass
+
+    class C(A):
+        __slots__ = 'baz'
+
+    assert slot_names(A) == ('foo', 'bar')
+    assert slot_names(B) == ('foo', 'bar')
+    assert slot_names(C) == ('baz', 'foo', 'bar')
+    assert repr(B(1)) == 'B(foo=1, bar=2)'
+
 
 def test_format_sample():
     assert format_sample(1) == '1'
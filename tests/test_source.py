@@ -4,8 +4,10 @@
 #
 # SPDX-License-Identifier: GPL-2.0-or-later
 
+import io
 import csv
 import json
+import math
 from unittest import mock
 
 import pytest
@@ -15,6 +17,7 @@ except ImportError:
     yaml = None
 
 from structa.analyzer import ValidationWarning
+from structa import source
 from structa.source import Source
 
 
@@ -51,6 +54,32 @@ def test_source_sample_limit(tmpdir):
         assert f.tell() == 1000
 
 
+def test_source_encoding_shortcuts():
+    for encoding, expected in (
+        ('utf-8-sig', 'UTF-8-SIG'),
+        ('utf-16-le', 'UTF-16'),
+        ('utf-16-be', 'UTF-16'),
+        ('utf-32-le', 'UTF-32'),
+        ('utf-32-be', 'UTF-32'),
+    ):
+        bom = b'' if encoding == 'utf-8-sig' else '\ufeff'.encode(encoding)
+        s = Source(io.BytesIO(bom + '[1, "caf\u00e9"]'.encode(encoding)))
+        assert s.encoding == expected
+        assert s.data == [1, 'caf\u00e9']
+    s = Source(io.BytesIO(b'[1, "cafe"]'), sample_limit=4)
+    assert s.encoding == 'utf-8'
+    assert s.data == [1, 'cafe']
+    s = Source(io.BytesIO('[1, "caf\u00e9"]'.encode('utf-8')), sample_limit=4)
+    assert s.encoding == 'utf-8'
+    assert s.data == [1, 'caf\u00e9']
+    # BOM-less UTF-16/32 of ASCII text is also all ASCII bytes (with NULs)
+    doc = [{'name': f'value {i}'} for i in range(50)]
+    for encoding in ('utf-16-le', 'utf-16-be', 'utf-32-le', 'utf-32-be'):
+        s = Source(io.BytesIO(json.dumps(doc).encode(encoding)), format='json')
+        assert s.encoding != 'utf-8'
+        assert s.data == doc
+
+
 def test_source_encoding(tmpdir, table):
     filename = str(tmpdir.join('latin-1.csv'))
     with open(filename, 'w', encoding='latin-1') as f:
@@ -136,6 +165,15 @@ def test_source_csv_data(tmpdir, table):
         assert s.data == table[1:]
 
 
+def test_source_csv_line_breaks():
+    # Rows are split as str.splitlines() splits them, which includes form
+    # feeds and unicode line separators, not just \r and \n (csv.reader only
+    # strips the latter from the end of each row)
+    data = 'a,b\r\n1,2\x0c3,4\u20285,6\n'.encode('utf-8')
+    s = Source(io.BytesIO(data), format='csv', encoding='utf-8',
+               csv_delimiter=',', csv_quotechar='"')
+    assert s.data == [['1', '2\x0c'], ['3', '4\u2028'], ['5', '6']]
+
 def test_source_json_data(tmpdir, table):
     data_file = str(tmpdir.join('data.json'))
     with open(data_file, 'w', encoding='utf-8') as f:
@@ -147,6 +185,48 @@ def test_source_json_data(tmpdir, table):
         assert s.data == table
 
 
+@pytest.mark.skipif(yaml is None, reason="Requires ruamel.yaml")
+def test_source_yaml_1_2():
+    # Scalars are resolved as YAML 1.2, not 1.1
+    doc = b'- yes\n- 010\n- 12:30\n- 0o17\n'
+    s = Source(io.BytesIO(doc), format='yaml')
+    assert s.data == ['yes', 10, '12:30', 15]
+
+
+def test_source_json_extremes():
+    doc = '[1, 123456789012345678901234567890, NaN, Infinity, "a"]'
+    for strict in (True, False):
+        data = Source(io.BytesIO(doc.encode('utf-8')), json_strict=strict).data
+        assert data[:2] == [1, 123456789012345678901234567890]
+        assert isinstance(data[1], int)
+        assert math.isnan(data[2])
+        assert data[3:] == [math.inf, 'a']
+    doc = '["a\tb"]'
+    with pytest.raises(ValueError):
+        Source(io.BytesIO(doc.encode('utf-8')), format='json').data
+    s = Source(io.BytesIO(doc.encode('utf-8')), format='json', json_strict=False)
+    assert s.data == ['a\tb']
+    if source.orjson is not None:
+        with mock.patch.object(
+            source.orjson, 'loads', wraps=source.orjson.loads
+        ) as loads:
+            data = Source(io.BytesIO(b'[1, NaN]'), encoding='utf-8').data
+            assert data[0] == 1 and math.isnan(data[1])
+            assert loads.call_count == 1
+    with mock.patch('structa.source.orjson', None):
+        s = Source(io.BytesIO(b'[1, 2.5, "a"]'))
+        assert s.data == [1, 2.5, 'a']
+    doc = '["caf\u00e9"]'.encode('utf-8')
+    assert Source(io.BytesIO(doc), encoding='utf-8').data == ['caf\u00e9']
+    doc = b'["caf\xe9"]'
+    with pytest.raises(UnicodeDecodeError):
+        Source(io.BytesIO(doc), encoding='utf-8', format='json').data
+    assert Source(io.BytesIO(doc), encoding='utf-8', encoding_strict=False,
+                  format='json').data == ['caf\ufffd']
+    with pytest.raises(UnicodeDecodeError):
+        Source(io.BytesIO(doc), encoding='ascii', format='json').data
+
+
 @pytest.mark.skipif(yaml is None, reason="Requires ruamel.yaml")
 def test_source_yaml_data(tmpdir, table):
     data_file = str(tmpdir.join('data.yaml'))
@@ -225,6 +305,10 @@ def test_source_unknown(tmpdir):
         f.write('\n' * 100)
     with open(filename, 'rb') as f:
         assert Source(f).format == 'unknown'
+    with open(filename, 'w') as f:
+        f.write('test\n' * 100)
+    with open(filename, 'rb') as f:
+        assert Source(f).format == 'unknown'
 
 
 def test_source_bad_data(tmpdir):
@@ -5,7 +5,9 @@
 # SPDX-License-Identifier: GPL-2.0-or-later
 
 import sys
+import threading
 import datetime as dt
+from copy import copy
 from collections import namedtuple, Counter
 
 import pytest
@@ -85,6 +87,24 @@ def test_pattern():
     assert tostring(xml(Type())) == b'<type/>'
 
 
+def test_type_copy():
+    s = Str(Counter(('abc', 'abd')), pattern=[any_char, any_char, any_char])
+    c = copy(s)
+    assert c is not s
+    assert c.values is s.values
+    assert c.lengths is s.lengths
+    assert c.pattern is s.pattern
+    f = Field('foo', count=5, optional=False)
+    c = copy(f)
+    assert (c.value, c.count, c.optional) == ('foo', 5, False)
+    l = SourcesList([[1]], content=[Int(Counter((1,)))])
+    l.extra = 'foo'
+    c = copy(l)
+    assert c.content is l.content
+    assert c.extra == 'foo'
+    assert copy(Empty()) is Empty()
+
+
 def test_dict():
     data = [
         {},
@@ -269,6 +289,9 @@ def test_dictfield_equality():
     d = DictField(Field('foo', 3), Int(Counter((1, 2, 3))))
     assert d == d
     assert not d == 'foo'
+    # A field without a value never compares equal, even to itself
+    d = DictField(Field('foo', 3))
+    assert not d == d
 
 
 def test_dict_merge_scalar_fields():
@@ -525,6 +548,9 @@ def test_tuplefield_equality():
     t = TupleField(Field(0, 3), Int(Counter((1, 2, 3))))
     assert t == t
     assert not t == 'foo'
+    # A field without a value never compares equal, even to itself
+    t = TupleField(Field(0, 3))
+    assert not t == t
 
 
 def test_list():
@@ -559,6 +585,64 @@ def test_list_with_pattern():
     assert iselement(xml(pattern).find('content').find('int'))
 
 
+def test_list_merge_nested():
+    def nested(data, content):
+        return List([data], content=[List(data, content=[content])])
+
+    ints = nested([[1, 2], [3]], Int(Counter((1, 2, 3))))
+    more_ints = nested([[4]], Int(Counter((4,))))
+    strs = nested([['a']], Str(Counter('a')))
+    result = ints + more_ints
+    assert result == ints
+    assert result.content[0].content[0].values.min == 1
+    assert result.content[0].content[0].values.max == 4
+    assert ints != strs
+    with pytest.raises(TypeError):
+        ints + strs
+
+
+def test_list_merge_threads():
+    def nested(data, content):
+        return List([data], content=[List(data, content=[content])])
+
+    ints = nested([[1, 2], [3]], Int(Counter((1, 2, 3))))
+    more_ints = nested([[4]], Int(Counter((4,))))
+    strs = nested([['a']], Str(Counter('a')))
+
+    def merge_ints():
+        result = ints + more_ints
+        assert result == ints
+        assert result.content[0].content[0].values.max == 4
+
+    def merge_strs():
+        assert ints != strs
+        with pytest.raises(TypeError):
+            ints + strs
+
+    errors = []
+    def run(merge):
+        try:
+            for i in range(200):
+                merge()
+        except Exception as exc:
+            errors.append(exc)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [
+            threading.Thread(target=run, args=(merge,))
+            for merge in (merge_ints, merge_strs, merge_ints, merge_strs)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert not errors
+
+
 def test_list_with_long_pattern():
     data = [
         [
@@ -636,6 +720,14 @@ def test_fixed_str():
     assert pattern.lengths.min == pattern.lengths.max == 6
     assert pattern.values.unique
     assert str(pattern) == 'str pattern=0x00xx'
+    assert pattern.pattern_str == '0x00xx'
+    assert pattern.pattern_str is pattern.pattern_str
+    merged = pattern + Str(Counter(['0x1000']), pattern=[
+        CharClass('0'), CharClass('x'), CharClass('1'), CharClass('0'),
+        CharClass('0'), CharClass('0')])
+    assert merged.pattern_str == '0x[01]0xx'
+    assert pattern.pattern_str == '0x00xx'
+    assert Str(Counter(data)).pattern_str is None
     pattern.validate('0x0012')
     with pytest.raises(ValueError):
         pattern.validate('0xff')
@@ -645,6 +737,24 @@ def test_fixed_str():
         pattern.validate('0x00fg')
 
 
+def test_pattern_regex():
+    regex = pattern_regex((CharClass('0'), CharClass('x'), hex_digit, AnyChar()))
+    assert regex is pattern_regex(
+        (CharClass('0'), CharClass('x'), hex_digit, AnyChar()))
+    assert regex.match('0xf\n')
+    assert regex.match('0xa-foo')
+    assert not regex.match('0xg-')
+    assert not regex.match('0x')
+    regex = pattern_regex((CharClass('-]^\\'), CharClass(set())))
+    assert not regex.match('-a')
+    assert not regex.match('^')
+    assert pattern_regex(()).match('')
+    assert pattern_regex((hex_digit, CharClass('abd'))).pattern == '[0-9A-Fa-f][abd]'
+    regex = pattern_regex((CharClass('-./\\]^_'),))
+    assert all(regex.match(c) for c in '-./\\]^_')
+    assert not regex.match(',') and not regex.match('0') and not regex.match('`')
+
+
 def test_str_repr():
     pattern = StrRepr(Int(Counter({1, 2, 3, 4})), pattern='d')
     assert str(pattern) == 'str of int range=1..4 pattern=d'
@@ -998,6 +1108,11 @@ def test_field_of_scalar():
     with pytest.raises(TypeError):
         f2 > 'abc'
     assert f1 != 1
+    assert hash(f1) == hash(f2) == hash(Field('url', 5, optional=True))
+    assert {f1, f2, f3, f4} == {f1, f3, f4}
+    # Equal items must hash equally, including those of other types
+    assert hash(f1) == hash(t1)
+    assert f1 == Value([1]) and hash(f1) == hash(Value([1]))
 
 
 def test_field_of_tuples():
@@ -1052,6 +1167,16 @@ def test_fields():
     with pytest.raises(ValueError):
         pattern.validate(1)
 
+    data = {'url', 1, 2.0}
+    pattern = Fields({Field(s, False) for s in data})
+    pattern.validate(1)
+    pattern.validate(1.0)
+    pattern.validate(2)
+    with pytest.raises(ValueError):
+        pattern.validate(3)
+    with pytest.raises(ValueError):
+        pattern.validate(['url'])
+
 
 def test_value():
     pattern = Value(sample=[])